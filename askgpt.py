@@ -71,10 +71,15 @@
 import os
 import sys
 import json
-import openai
-import shutil
+import hashlib
+import functools
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 HOME = Path(os.environ.get("HOME", "~"))
 ASKGPT_DIR = HOME / ".askgpt"
 DEFAULT_MODEL = "gpt-4o"
@@ -83,32 +88,52 @@ WORKSPACE_CONF = ASKGPT_DIR / "workspace.conf"
 EOF_CONF = ASKGPT_DIR / "eof.conf"
 CURRENT_SESSION_FILE = ASKGPT_DIR / "current_session"
 INSTALL_PATH = HOME / "bin" / "askgpt"
+INSTALL_MARKER = ASKGPT_DIR / ".installed"
 WORKSPACES_LIST = ASKGPT_DIR / "workspaces.json"
+REPLY_CACHE_DIR = ASKGPT_DIR / "cache"
 
 DEFAULT_EOF = "EOF"
 
+def read_small_file(path):
+    # One open+read+close for tiny config files, skipping the separate
+    # exists() stat and the TextIOWrapper machinery. None when missing.
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        return os.read(fd, 4096).decode("utf-8").strip()
+    finally:
+        os.close(fd)
+
 def ensure_directories():
-    if not ASKGPT_DIR.exists():
-        ASKGPT_DIR.mkdir(parents=True, exist_ok=True)
+    ASKGPT_DIR.mkdir(parents=True, exist_ok=True)
     if not EOF_CONF.exists():
         with EOF_CONF.open("w", encoding="utf-8") as f:
             f.write(DEFAULT_EOF + "\n")
 
+@functools.lru_cache(maxsize=1)
 def load_eof_word():
-    if EOF_CONF.exists():
-        return EOF_CONF.read_text(encoding="utf-8").strip()
+    text = read_small_file(EOF_CONF)
+    if text:
+        return text
     return DEFAULT_EOF
 
 def save_eof_word(eof_word):
     with EOF_CONF.open("w", encoding="utf-8") as f:
         f.write(eof_word + "\n")
+    load_eof_word.cache_clear()
+
+_CURRENT_SESSION_UNSET = object()
+_current_session_cache = _CURRENT_SESSION_UNSET
 
 def get_current_session():
-    if CURRENT_SESSION_FILE.exists():
-        sess = CURRENT_SESSION_FILE.read_text(encoding="utf-8").strip()
-        if sess:
-            return sess
-    return None
+    global _current_session_cache
+    if _current_session_cache is not _CURRENT_SESSION_UNSET:
+        return _current_session_cache
+    sess = read_small_file(CURRENT_SESSION_FILE) or None
+    _current_session_cache = sess
+    return sess
 
 def ensure_current_session():
     sess = get_current_session()
@@ -123,65 +148,139 @@ def ensure_current_session():
     return sess
 
 def set_current_session(sessionname):
+    global _current_session_cache
     with CURRENT_SESSION_FILE.open("w", encoding="utf-8") as f:
         f.write(sessionname + "\n")
+    _current_session_cache = sessionname
 
+@functools.lru_cache(maxsize=1)
 def get_workspace_path():
-    if WORKSPACE_CONF.exists():
-        ws = WORKSPACE_CONF.read_text(encoding="utf-8").strip()
-        if ws:
-            return Path(ws)
+    ws = read_small_file(WORKSPACE_CONF)
+    if ws:
+        return Path(ws)
     return None
 
 def set_workspace_path(ws_path):
     with WORKSPACE_CONF.open("w", encoding="utf-8") as f:
         f.write(str(ws_path) + "\n")
+    get_workspace_path.cache_clear()
+    get_sessions_dir.cache_clear()
     register_workspace(ws_path)
 
 def clear_workspace():
     if WORKSPACE_CONF.exists():
         WORKSPACE_CONF.unlink()
+    get_workspace_path.cache_clear()
+    get_sessions_dir.cache_clear()
 
+@functools.lru_cache(maxsize=1)
 def get_sessions_dir():
     ws = get_workspace_path()
     if ws:
         sdir = ws / ".askgpt" / "sessions"
-        if not sdir.exists():
-            sdir.mkdir(parents=True, exist_ok=True)
-        return sdir
     else:
         sdir = ASKGPT_DIR / "sessions"
-        if not sdir.exists():
-            sdir.mkdir(parents=True, exist_ok=True)
-        return sdir
+    sdir.mkdir(parents=True, exist_ok=True)
+    return sdir
 
 def session_file(sessionname):
+    # Legacy whole-session JSON file (pre-JSONL format).
     return get_sessions_dir() / f"{sessionname}.json"
 
-def session_exists(sessionname):
-    return session_file(sessionname).exists()
+def session_file_jsonl(sessionname):
+    return get_sessions_dir() / f"{sessionname}.jsonl"
 
-def load_session(sessionname):
+def session_model_file(sessionname):
+    return get_sessions_dir() / f"{sessionname}.model"
+
+def session_exists(sessionname):
+    return session_file_jsonl(sessionname).exists() or session_file(sessionname).exists()
+
+def json_loads(raw):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def json_dumps_bytes(data):
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS)
+    return (json.dumps(data, ensure_ascii=False, indent=2) + "\n").encode("utf-8")
+
+def json_dumps_line(data):
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS)
+    return (json.dumps(data, ensure_ascii=False) + "\n").encode("utf-8")
+
+def load_session(sessionname, default_model=None):
+    # Callers that already resolved the default model can pass it in to
+    # skip even the memoized lookup.
+    if default_model is None:
+        default_model = get_default_model()
+    jl = session_file_jsonl(sessionname)
+    if jl.exists():
+        model = read_small_file(session_model_file(sessionname)) or default_model
+        # Read the log once and preallocate the list from the line count
+        # instead of growing it append-by-append.
+        raw_lines = jl.read_bytes().splitlines()
+        messages = [None] * len(raw_lines)
+        n = 0
+        for line in raw_lines:
+            if line:
+                messages[n] = json_loads(line)
+                n += 1
+        del messages[n:]
+        return {"model": model, "messages": messages}
     sf = session_file(sessionname)
     if sf.exists():
-        with sf.open("r", encoding="utf-8") as f:
-            data = json.load(f)
-            if isinstance(data, list):
-                data = {"model": get_default_model(), "messages": data}
+        raw = sf.read_bytes()
+        data = json_loads(raw)
+        if raw[:16].lstrip()[:1] == b"{":
+            # Dict schema: only the model field can be missing.
             if "model" not in data:
-                data["model"] = get_default_model()
-            return data
-    return {"model": get_default_model(), "messages": []}
+                data["model"] = default_model
+        else:
+            # Oldest format: a bare message list.
+            data = {"model": default_model, "messages": data}
+        # One-shot migration to the JSONL format so every later turn is a
+        # cheap append instead of a full-history rewrite.
+        save_session(sessionname, data)
+        sf.unlink(missing_ok=True)
+        return data
+    return {"model": default_model, "messages": []}
 
 def save_session(sessionname, data):
-    sf = session_file(sessionname)
-    with sf.open("w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-        f.write("\n")
+    # Full rewrite in the JSONL format: one message per line plus a tiny
+    # companion file holding the model. Only needed when the message list
+    # is not a pure append (create, model change, legacy migration);
+    # interactive turns go through save_message instead.
+    mf = session_model_file(sessionname)
+    with mf.open("w", encoding="utf-8") as f:
+        f.write(data.get("model", get_default_model()) + "\n")
+    jl = session_file_jsonl(sessionname)
+    # Write-then-rename: one write syscall, and a crash mid-save can never
+    # leave a truncated log behind.
+    tmp = jl.with_suffix(".jsonl.tmp")
+    tmp.write_bytes(b"".join(json_dumps_line(msg) for msg in data["messages"]))
+    os.replace(tmp, jl)
+
+def save_message(sessionname, msg):
+    with session_file_jsonl(sessionname).open("ab") as f:
+        f.write(json_dumps_line(msg))
 
 def list_sessions():
-    for f in get_sessions_dir().glob("*.json"):
-        print(f.stem)
+    # One scandir pass instead of two globs; no per-entry Path objects.
+    names = set()
+    with os.scandir(get_sessions_dir()) as it:
+        for entry in it:
+            if not entry.is_file(follow_symlinks=False):
+                continue
+            name = entry.name
+            if name.endswith(".jsonl"):
+                names.add(name[:-6])
+            elif name.endswith(".json"):
+                names.add(name[:-5])
+    if names:
+        sys.stdout.write("\n".join(sorted(names)) + "\n")
 
 def create_session_silent(sessionname):
     data = {
@@ -198,8 +297,7 @@ def create_session(sessionname):
     set_current_session(sessionname)
     print(f"Created and switched to session: {sessionname}")
 
-def print_help():
-    help_msg = """
+HELP_TEXT = """
 Usage: askgpt [options]
 
 Options:
@@ -217,6 +315,7 @@ Options:
   -p                 Show the past history of the current session in JSON.
   -h                 Show this help message.
   -e eofword         Change the EOF word to 'eofword'.
+  --no-cache         Skip the local reply cache and always query the API.
   -f filename        Read the content of 'filename' as a user message first, then stay interactive.
 
   -w workspace_path  Switch the workspace to 'workspace_path'
@@ -237,8 +336,11 @@ File input and EOF behavior:
   - If `-f filename` is given, the file's content is used as the first user message if you hit EOF immediately.
   - If no `-f` is given and you hit EOF immediately, the program exits.
   - After processing `-f`, the program remains interactive. Hitting EOF with no new input lines afterwards exits.
-"""
-    print(help_msg.strip())
+""".strip()
+
+def print_help():
+    sys.stdout.write(HELP_TEXT)
+    sys.stdout.write("\n")
 
 def switch_session(sessionname):
     if not session_exists(sessionname):
@@ -248,52 +350,133 @@ def switch_session(sessionname):
     print(f"Switched to session: {sessionname}")
 
 def delete_session(sessionname):
-    sf = session_file(sessionname)
-    if not sf.exists():
+    if not session_exists(sessionname):
         print(f"Session {sessionname} does not exist.")
         sys.exit(1)
-    sf.unlink()
+    for sf in (session_file_jsonl(sessionname), session_model_file(sessionname), session_file(sessionname)):
+        sf.unlink(missing_ok=True)
     cur = get_current_session()
     if cur == sessionname:
         CURRENT_SESSION_FILE.unlink(missing_ok=True)
+        global _current_session_cache
+        _current_session_cache = None
     print(f"Session {sessionname} deleted.")
 
 def display_current_session_custom_format(messages):
+    parts = []
     for msg in messages:
         role = msg["role"]
-        content = msg["content"]
         if role == "assistant":
-            print("[GPT]")
-            print(content.strip())
+            parts.append("[GPT]\n")
+            parts.append(msg["content"].strip())
+            parts.append("\n")
         elif role == "user":
-            print("[USER]")
-            print(content.strip())
+            parts.append("[USER]\n")
+            parts.append(msg["content"].strip())
+            parts.append("\n")
         # system is skipped
+    sys.stdout.write("".join(parts))
 
 def display_all_json(data):
-    print(json.dumps(data, ensure_ascii=False, indent=2))
+    sys.stdout.buffer.write(json_dumps_bytes(data))
+    sys.stdout.buffer.flush()
+
+def dump_session_raw(sessionname):
+    # For legacy whole-JSON sessions the file may already hold exactly
+    # what -a/-p print, in which case the bytes are streamed straight
+    # through instead of being decoded and re-encoded. Only safe when the
+    # file is already in the normalized {"model": ..., "messages": ...}
+    # shape; bare-list or model-less files still need load_session's
+    # coercions (which also migrate them to JSONL).
+    sf = session_file(sessionname)
+    if sf.exists() and not session_file_jsonl(sessionname).exists():
+        raw = sf.read_bytes()
+        if raw[:16].lstrip()[:1] == b"{" and b'"model"' in raw:
+            sys.stdout.buffer.write(raw)
+            sys.stdout.buffer.flush()
+            return
+    display_all_json(load_session(sessionname))
 
+@functools.lru_cache(maxsize=1)
 def get_default_model():
-    if MODEL_CONF.exists():
-        return MODEL_CONF.read_text(encoding="utf-8").strip()
+    text = read_small_file(MODEL_CONF)
+    if text:
+        return text
     return DEFAULT_MODEL
 
+reply_cache_enabled = True
+
+def reply_cache_path(model, messages):
+    # Content-addressed by model + full message history, so a hit means
+    # the exact same conversation prefix was already answered.
+    if orjson is not None:
+        key_bytes = orjson.dumps([model, messages], option=orjson.OPT_SORT_KEYS)
+    else:
+        key_bytes = json.dumps([model, messages], sort_keys=True, separators=(",", ":")).encode("utf-8")
+    key = hashlib.blake2b(key_bytes, digest_size=16).hexdigest()
+    return REPLY_CACHE_DIR / key[:2] / key
+
+_openai_client = None
+
+def get_openai_client():
+    # One client per process so the httpx connection pool and TLS session
+    # are reused across turns; openai itself is imported lazily so
+    # metadata-only commands never pay for the large HTTP import chain.
+    global _openai_client
+    if _openai_client is None:
+        import openai
+        _openai_client = openai.OpenAI()
+    return _openai_client
+
 def query_gpt(data):
     model = data.get("model", get_default_model())
-    openai.api_key = os.environ.get("OPENAI_API_KEY", "")
-    if not openai.api_key:
+
+    cache_path = None
+    if reply_cache_enabled:
+        cache_path = reply_cache_path(model, data["messages"])
+        if cache_path.exists():
+            reply = cache_path.read_bytes().decode("utf-8")
+            sys.stdout.write(reply)
+            sys.stdout.write("\n")
+            return reply
+
+    if not os.environ.get("OPENAI_API_KEY"):
         print("Error: OPENAI_API_KEY not set.")
         sys.exit(1)
 
-    response = openai.ChatCompletion.create(
+    client = get_openai_client()
+    stream = client.chat.completions.create(
         model=model,
-        messages=data["messages"]
+        messages=data["messages"],
+        stream=True
     )
-    return response["choices"][0]["message"]["content"]
+    # Print tokens as they arrive so the user sees output at first-token
+    # latency instead of waiting for the full reply.
+    buf = []
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        piece = chunk.choices[0].delta.content or ""
+        if piece:
+            sys.stdout.write(piece)
+            sys.stdout.flush()
+            buf.append(piece)
+    sys.stdout.write("\n")
+    reply = "".join(buf)
+    if cache_path is not None:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_path.with_suffix(".tmp")
+        tmp.write_bytes(reply.encode("utf-8"))
+        os.replace(tmp, cache_path)
+    return reply
 
 def interactive_mode(eof_word, initial_file_content=None):
     sessionname = ensure_current_session()
     data = load_session(sessionname)
+    # Keep one stable list object for the whole session and prebind its
+    # append; data is only a container for query_gpt/save_session.
+    messages = data["messages"]
+    append_message = messages.append
 
     no_question_asked_yet = True
     file_content_used = False  # To track if we've used -f content yet
@@ -302,61 +485,76 @@ def interactive_mode(eof_word, initial_file_content=None):
     print(f"Type your question and end input with '{eof_word}' on a single line.")
     print("If no query asked yet, empty line shows history (-d format). After queries, empty line does nothing.\n")
 
+    stdin = sys.stdin.buffer
+    eof_bytes = eof_word.encode("utf-8")
+
     while True:
-        user_lines = []
+        # Accumulate raw input in a single bytearray and decode once at the
+        # end, instead of one str allocation per line via input().
+        buf = bytearray()
+        num_lines = 0
+        user_message = None
         while True:
-            try:
-                line = input()
-            except EOFError:
-                # If EOF from terminal (Ctrl+D), treat as user typed EOF word
+            raw = stdin.readline()
+            if not raw:
+                # Real EOF (Ctrl+D), treat as user typed EOF word
                 # No user input lines: if initial_file_content and not used, use it
                 # else exit.
                 if not file_content_used and initial_file_content is not None:
                     # Use the file content
-                    user_lines = [initial_file_content]
+                    user_message = initial_file_content
                     file_content_used = True
                     break
                 else:
                     # Exit
                     return
 
-            if line.strip() == "":
+            stripped = raw.strip()
+            if stripped == b"":
                 # empty line
                 if no_question_asked_yet:
                     # show history in -d format
-                    display_current_session_custom_format(data["messages"])
+                    display_current_session_custom_format(messages)
                     return
                 else:
                     # After queries, empty line does nothing, just prompt again
                     continue
 
-            if line.strip() == eof_word:
+            if stripped == eof_bytes:
                 # EOF word encountered
-                if len(user_lines) == 0:
+                if num_lines == 0:
                     # No user input lines before EOF
                     if not file_content_used and initial_file_content is not None:
                         # Use file content now
-                        user_lines = [initial_file_content]
+                        user_message = initial_file_content
                         file_content_used = True
                     else:
                         # No input and no file content pending
                         # means exit
                         return
                 break
-            user_lines.append(line)
-
-        if len(user_lines) == 0:
-            # No lines before EOF (other than handled above)
-            # This should be exit condition, but we handled above.
-            continue
-
-        # We have user message (either from file content or typed lines)
-        user_message = "\n".join(user_lines)
-        data["messages"].append({"role": "user", "content": user_message})
+            buf.extend(raw)
+            num_lines += 1
+
+        if user_message is None:
+            if num_lines == 0:
+                # No lines before EOF (other than handled above)
+                # This should be exit condition, but we handled above.
+                continue
+            # We have typed lines: decode the whole buffer in one go
+            user_message = buf.decode("utf-8").rstrip("\n")
+        user_msg = {"role": "user", "content": user_message}
+        append_message(user_msg)
         assistant_reply = query_gpt(data)
-        data["messages"].append({"role":"assistant", "content": assistant_reply})
-        save_session(sessionname, data)
-        print(assistant_reply)
+        assistant_msg = {"role": "assistant", "content": assistant_reply}
+        append_message(assistant_msg)
+        if session_file_jsonl(sessionname).exists():
+            # Append just the new pair instead of rewriting the history.
+            save_message(sessionname, user_msg)
+            save_message(sessionname, assistant_msg)
+        else:
+            save_session(sessionname, data)
+        # Reply was already streamed to stdout by query_gpt.
         no_question_asked_yet = False
         if file_content_used is False and (initial_file_content is None or (initial_file_content is not None and user_message != initial_file_content)):
             file_content_used = True
@@ -364,11 +562,14 @@ def interactive_mode(eof_word, initial_file_content=None):
 def file_input_mode(filename):
     # Instead of immediately sending and exiting, we read the file content
     # and pass it as initial_file_content to interactive_mode.
-    if not Path(filename).exists():
+    # Bytes read + one decode; avoids the TextIOWrapper building the str
+    # incrementally for large files. Opening directly instead of checking
+    # exists() first saves a stat and avoids the TOCTOU window.
+    try:
+        content = Path(filename).read_bytes().decode("utf-8")
+    except FileNotFoundError:
         print(f"File not found: {filename}")
         sys.exit(1)
-    with open(filename, "r", encoding="utf-8") as f:
-        content = f.read()
 
     eof_word = load_eof_word()
     # Start interactive mode with initial file content
@@ -376,19 +577,26 @@ def file_input_mode(filename):
 
 def set_model_for_current_session(modelname):
     sessionname = ensure_current_session()
-    data = load_session(sessionname)
-    data["model"] = modelname
-    save_session(sessionname, data)
+    if session_file_jsonl(sessionname).exists():
+        # Only the model changed; no need to load and rewrite the log.
+        with session_model_file(sessionname).open("w", encoding="utf-8") as f:
+            f.write(modelname + "\n")
+    else:
+        data = load_session(sessionname)
+        data["model"] = modelname
+        save_session(sessionname, data)
     print(f"Model for session {sessionname} changed to {modelname}.")
 
 def set_global_default_model(modelname):
     with MODEL_CONF.open("w", encoding="utf-8") as f:
         f.write(modelname + "\n")
+    get_default_model.cache_clear()
     print(f"Global default model changed to {modelname}.")
 
 def clear_global_default_model():
     if MODEL_CONF.exists():
         MODEL_CONF.unlink()
+    get_default_model.cache_clear()
     print("Global default model reverted to gpt-4o.")
 
 def set_workspace(workspace_path):
@@ -405,13 +613,11 @@ def register_workspace(ws_path):
 
 def load_workspaces():
     if WORKSPACES_LIST.exists():
-        with WORKSPACES_LIST.open("r", encoding="utf-8") as f:
-            return json.load(f)
+        return json_loads(WORKSPACES_LIST.read_bytes())
     return []
 
 def save_workspaces(lst):
-    with WORKSPACES_LIST.open("w", encoding="utf-8") as f:
-        json.dump(lst, f, ensure_ascii=False, indent=2)
+    WORKSPACES_LIST.write_bytes(json_dumps_bytes(lst))
 
 def list_workspaces():
     current_ws = get_workspace_path()
@@ -434,105 +640,132 @@ def list_workspaces():
         print("No other known workspaces.")
 
 def first_run_install_check():
-    if not INSTALL_PATH.exists():
-        print("It seems this is the first time you are running askgpt.")
-        ans = input(f"Would you like to install this script to {INSTALL_PATH}? (y/n): ")
-        if ans.lower().startswith('y'):
-            if not INSTALL_PATH.parent.exists():
-                INSTALL_PATH.parent.mkdir(parents=True, exist_ok=True)
-            script_path = Path(sys.argv[0]).resolve()
-            shutil.copy(script_path, INSTALL_PATH)
-            INSTALL_PATH.chmod(0o755)
-            print(f"Installed askgpt to {INSTALL_PATH}.")
-            print("Please add the following line to your ~/.bashrc (if not already present):")
-            print('    export PATH="$HOME/bin:$PATH"')
-            print("Then run 'source ~/.bashrc' to update your PATH.")
-        else:
-            print("Skipping installation. You can manually install the script later if you want.")
+    # Steady state is a single stat on the marker file.
+    if INSTALL_MARKER.exists():
+        return
+    if os.path.lexists(INSTALL_PATH):
+        INSTALL_MARKER.touch()
+        return
+    print("It seems this is the first time you are running askgpt.")
+    ans = input(f"Would you like to install this script to {INSTALL_PATH}? (y/n): ")
+    if ans.lower().startswith('y'):
+        import shutil
+        INSTALL_PATH.parent.mkdir(parents=True, exist_ok=True)
+        script_path = Path(sys.argv[0]).resolve()
+        shutil.copy(script_path, INSTALL_PATH)
+        INSTALL_PATH.chmod(0o755)
+        INSTALL_MARKER.touch()
+        print(f"Installed askgpt to {INSTALL_PATH}.")
+        print("Please add the following line to your ~/.bashrc (if not already present):")
+        print('    export PATH="$HOME/bin:$PATH"')
+        print("Then run 'source ~/.bashrc' to update your PATH.")
+    else:
+        print("Skipping installation. You can manually install the script later if you want.")
 
-def main():
-    ensure_directories()
-    first_run_install_check()
-    eof_word = load_eof_word()
+def show_current_session_name():
+    sess = get_current_session()
+    if sess is None:
+        sess = ensure_current_session()
+    print(sess)
+
+def show_session_json(past_only=False):
+    sess = ensure_current_session()
+    if past_only:
+        # Past history only: drop the latest user/assistant exchange
+        # before encoding so it is never serialized at all.
+        data = load_session(sess)
+        data["messages"] = data["messages"][:-2]
+        display_all_json(data)
+    else:
+        dump_session_raw(sess)
+
+def show_past_session_json():
+    show_session_json(past_only=True)
+
+def show_session_history():
+    sess = ensure_current_session()
+    data = load_session(sess)
+    display_current_session_custom_format(data["messages"])
+
+def clear_workspace_cmd():
+    clear_workspace()
+    print("Workspace reverted to default.")
+
+def change_eof_word(eofword):
+    save_eof_word(eofword)
+    print(f"EOF word changed to: {eofword}")
+
+# Flag dispatch tables: one dict lookup instead of a chain of string
+# comparisons. -d appears in both since it has a no-arg (display) and a
+# one-arg (delete) form.
+NO_ARG_CMDS = {
+    "-l": list_sessions,
+    "-n": show_current_session_name,
+    "-a": show_session_json,
+    "-p": show_past_session_json,
+    "-h": print_help,
+    "-d": show_session_history,
+    "-wc": clear_workspace_cmd,
+    "-mc": clear_global_default_model,
+    "-wl": list_workspaces,
+}
+
+ONE_ARG_CMDS = {
+    "-c": create_session,
+    "-s": switch_session,
+    "-d": delete_session,
+    "-e": change_eof_word,
+    "-f": file_input_mode,
+    "-w": set_workspace,
+    "-m": set_model_for_current_session,
+    "-ms": set_global_default_model,
+}
 
+def main():
     args = sys.argv[1:]
 
+    # Strip --no-cache before any arg-count checks so it combines with
+    # every mode, including plain `askgpt --no-cache` interactive use.
+    if "--no-cache" in args:
+        global reply_cache_enabled
+        reply_cache_enabled = False
+        args.remove("--no-cache")
+
+    if len(args) == 1 and args[0] in ("-h", "--help"):
+        # Help must be instant and side-effect-free: no directory setup,
+        # no install prompt.
+        print_help()
+        return
+
     if len(args) == 0:
-        # interactive mode without file input
-        interactive_mode(eof_word)
+        # Fast path for the most common invocation: straight into
+        # interactive mode, no flag scanning or dispatch.
+        ensure_directories()
+        if sys.stdin.isatty():
+            first_run_install_check()
+        interactive_mode(load_eof_word())
         return
 
+    ensure_directories()
+    if sys.stdin.isatty():
+        # Never prompt to self-install when driven by a pipe or script.
+        first_run_install_check()
+
     if len(args) == 1:
-        if args[0] == "-l":
-            list_sessions()
-            return
-        elif args[0] == "-n":
-            sess = get_current_session()
-            if sess is None:
-                sess = ensure_current_session()
-            print(sess)
-            return
-        elif args[0] == "-a":
-            sess = ensure_current_session()
-            data = load_session(sess)
-            display_all_json(data)
-            return
-        elif args[0] == "-p":
-            sess = ensure_current_session()
-            data = load_session(sess)
-            display_all_json(data)
-            return
-        elif args[0] == "-h":
-            print_help()
-            return
-        elif args[0] == "-d":
-            sess = ensure_current_session()
-            data = load_session(sess)
-            display_current_session_custom_format(data["messages"])
-            return
-        elif args[0] == "-wc":
-            clear_workspace()
-            print("Workspace reverted to default.")
-            return
-        elif args[0] == "-mc":
-            clear_global_default_model()
-            return
-        elif args[0] == "-wl":
-            list_workspaces()
-            return
-        else:
+        handler = NO_ARG_CMDS.get(args[0])
+        if handler is None:
             print("Invalid option. See -h for help.")
             sys.exit(1)
+        handler()
+        return
 
     if len(args) == 2:
-        if args[0] == "-c":
-            create_session(args[1])
-            return
-        elif args[0] == "-s":
-            switch_session(args[1])
-            return
-        elif args[0] == "-d":
-            delete_session(args[1])
-            return
-        elif args[0] == "-e":
-            save_eof_word(args[1])
-            print(f"EOF word changed to: {args[1]}")
-            return
-        elif args[0] == "-f":
-            file_input_mode(args[1])
-            return
-        elif args[0] == "-w":
-            set_workspace(args[1])
-            return
-        elif args[0] == "-m":
-            set_model_for_current_session(args[1])
-            return
-        elif args[0] == "-ms":
-            set_global_default_model(args[1])
-            return
-        else:
+        handler = ONE_ARG_CMDS.get(args[0])
+        if handler is None:
             print("Invalid option. See -h for help.")
             sys.exit(1)
+        handler(args[1])
+        return
 
     print("Invalid usage. See -h for help.")
     sys.exit(1)